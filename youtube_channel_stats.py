@@ -75,9 +75,45 @@ class YoutubeChannelStats:
         self.s3_data = s3_data
 
     QUEUING_INTERVAL = 1000
+    SQS_BATCH_SIZE = 10
+    SQS_BATCH_MAX_BYTES = 256 * 1024
     WAIT_WHEN_SERVICE_UNAVAILABLE = 30
     WAIT_WHEN_CONNECTION_RESET_BY_PEER = 60
 
+    def send_message_batch(self, queue, messages):
+        response = queue.send_messages(Entries=[{'Id': str(i), 'MessageBody': message}
+                                                for i, message in enumerate(messages)])
+        failed = response.get('Failed', [])
+        if len(failed) != 0:
+            raise Exception("Could not send {} of {} messages to SQS: {}".format(len(failed),
+                                                                               len(messages),
+                                                                               failed[0].get('Message')))
+        logging.info("Added %d messages to the queue", len(messages))
+
+    def send_messages(self, queue, messages):
+        batch = list()
+        batch_bytes = 0
+        for message in messages:
+            message_bytes = len(message.encode('utf-8'))
+            if len(batch) == self.SQS_BATCH_SIZE or batch_bytes + message_bytes > self.SQS_BATCH_MAX_BYTES:
+                self.send_message_batch(queue, batch)
+                batch = list()
+                batch_bytes = 0
+            batch.append(message)
+            batch_bytes = batch_bytes + message_bytes
+        if len(batch) != 0:
+            self.send_message_batch(queue, batch)
+
+    def channel_messages(self, reader):
+        channels_message = list()
+        for row in reader:
+            channels_message.append(row[0])
+            if len(channels_message) == self.QUEUING_INTERVAL:
+                yield json.dumps(channels_message, separators=(',', ':'))
+                channels_message = list()
+        if len(channels_message) != 0:
+            yield json.dumps(channels_message, separators=(',', ':'))
+
     def collect_channel_stats(self):
         logging.info("Start collecting Youtube channel stats - producer")
 
@@ -85,13 +121,11 @@ class YoutubeChannelStats:
         credentials_queue = sqs.get_queue_by_name(QueueName='youtube_credentials')
         credentials_queue.purge()
         logging.info('Cleaned queue for credentials')
-        for credential in self.credentials:
-            credentials_queue.send_message(MessageBody=credential['developer_key'])
+        self.send_messages(credentials_queue, [credential['developer_key'] for credential in self.credentials])
         logging.info('Enqueued credentials')
 
         athena = AthenaDatabase(database=self.athena_data, s3_output=self.s3_admin)
-        logging.info("Recreate table for Youtube channel stats")
-        athena.query_athena_and_wait(query_string="DROP TABLE IF EXISTS youtube_channel_stats")
+        logging.info("Create table for Youtube channel stats if needed and load new partitions")
         athena.query_athena_and_wait(query_string=CREATE_CHANNEL_STATS_JSON.format(s3_bucket=self.s3_data))
         athena.query_athena_and_wait(query_string="MSCK REPAIR TABLE youtube_channel_stats")
         channel_ids = Path(Path(__file__).parent, 'tmp', 'channel_ids.csv')
@@ -104,20 +138,12 @@ class YoutubeChannelStats:
         logging.info("There are %d channels to be processed: download them", channel_count)
 
         with open(channel_ids, newline='') as csv_reader:
-            reader = csv.DictReader(csv_reader)
+            reader = csv.reader(csv_reader)
+            next(reader)
             channels_queue = sqs.get_queue_by_name(QueueName='youtube_channels')
             channels_queue.purge()
             logging.info('Cleaned queue for channels')
-            channels_message = list()
-            for channel_id in reader:
-                channels_message.append(channel_id['channel_id'])
-                if len(channels_message) == self.QUEUING_INTERVAL:
-                    channels_queue.send_message(MessageBody=json.dumps(channels_message))
-                    channels_message = list()
-                    logging.info("Added %d channels to the queue", self.QUEUING_INTERVAL)
-            if len(channels_message) != 0:
-                channels_queue.send_message(MessageBody=json.dumps(channels_message))
-                logging.info("Added %d channels to the queue", len(channels_message))
+            self.send_messages(channels_queue, self.channel_messages(reader))
 
         logging.info("Concluded collecting channel stats - producer")
 